@@ -68,7 +68,7 @@ def _seleccionar_certificado(lista_certificados, nombre_certificado):
 
     return found
 
-def seleccionar_certificado_chrome(nombre_certificado='RICARDO ESCUDE'):
+def seleccionar_certificado_chrome(nombre_certificado='RICARDO ESCUDE', nombre_ventana='Chrome'):
     """
     Función principal para obtener la ventana de certificados y seleccionar el certificado deseado.
 
@@ -83,6 +83,8 @@ def seleccionar_certificado_chrome(nombre_certificado='RICARDO ESCUDE'):
     Args:
         nombre_certificado (str, optional): Texto o subcadena del nombre del certificado a seleccionar.
                                               Por defecto es 'RICARDO ESCUDE'.
+        nombre_ventana (str, optional): Texto o subcadena del título de la ventana de Chrome que muestra el popup.
+                                        Útil cuando hay varios navegadores abiertos. Por defecto es 'Chrome'.
 
     Returns:
         bool: True si se pudo seleccionar el certificado y se hizo clic en "Aceptar"; False en caso contrario.
@@ -93,7 +95,7 @@ def seleccionar_certificado_chrome(nombre_certificado='RICARDO ESCUDE'):
         else:
             logging.error("No se pudo seleccionar el certificado.")
     """
-    ventana_chrome = uiautomationHandler.obtener_ventana("Chrome", class_name="Chrome_WidgetWin_1")
+    ventana_chrome = uiautomationHandler.obtener_ventana(nombre_ventana, class_name="Chrome_WidgetWin_1")
     if not ventana_chrome:
         logging.error("No se encontró la ventana de certificados.")
         return False
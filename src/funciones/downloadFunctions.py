@@ -3,14 +3,25 @@ from src.utils.config import BASE_DIR
 from utils import loggerConfig
 import os
 import json
+import queue
 import time
 from selenium import webdriver
 
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog es opcional: sin él se usa wait_for_new_download (polling)
+    FileSystemEventHandler = object
+    Observer = None
+
 from utils import webConfiguration
 from funciones import webFunctions
 
 WEB = "https://ash-speed.hetzner.com/"
 
+# Extensiones de archivos temporales o que no son descargas válidas
+TEMP_EXTENSIONS = ('.crdownload', '.part', '.tmp', '.htm')
+
 def ensure_download_path(path: str) -> str:
     """Crea el directorio si no existe y devuelve la ruta absoluta."""
     os.makedirs(path, exist_ok=True)
@@ -32,18 +43,84 @@ def snapshot_folder_state(path: str) -> dict:
     Devuelve un snapshot del estado actual de los archivos válidos en el directorio de descargas.
     Solo incluye archivos que no sean temporales ni .htm.
     """
-    files = [
-        f for f in os.listdir(path)
-        if os.path.isfile(os.path.join(path, f))
-        and not f.endswith('.crdownload')
-        and not f.endswith('.htm')
-    ]
+    # os.scandir obtiene el tipo de cada entrada al listar el directorio, sin un stat por archivo
+    with os.scandir(path) as it:
+        files = [
+            e.name for e in it
+            if e.is_file()
+            and not e.name.endswith(('.crdownload', '.htm'))
+        ]
     state = {
         "path": os.path.abspath(path),
         "files": sorted(files)
     }
     return state
 
+class _DownloadEventHandler(FileSystemEventHandler):
+    """Encola el nombre de cada archivo descargado por completo (ignorando temporales)."""
+
+    def __init__(self, cola: queue.Queue):
+        super().__init__()
+        self.cola = cola
+
+    def _encolar(self, ruta: str):
+        nombre = os.path.basename(ruta)
+        if not nombre.endswith(TEMP_EXTENSIONS):
+            self.cola.put(nombre)
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._encolar(event.src_path)
+
+    def on_moved(self, event):
+        # Chrome descarga en nombre.crdownload y lo renombra al terminar
+        if not event.is_directory:
+            self._encolar(event.dest_path)
+
+def start_download_watcher(download_path: str):
+    """
+    Empieza a observar la carpeta de descargas mediante eventos del sistema de archivos (watchdog).
+    Devuelve (observer, cola) o None si watchdog no está disponible o no se puede iniciar,
+    en cuyo caso se debe usar wait_for_new_download.
+    """
+    if Observer is None:
+        return None
+    cola = queue.Queue()
+    try:
+        observer = Observer()
+        observer.schedule(_DownloadEventHandler(cola), download_path, recursive=False)
+        observer.start()
+    except Exception as e:
+        logging.warning(f"No se pudo iniciar el observador de descargas en {download_path}: {e}")
+        return None
+    return observer, cola
+
+def wait_for_download_events(cola: queue.Queue, num_descargas: int = 1, timeout: int = 7200) -> list:
+    """
+    Espera hasta recibir num_descargas archivos completados desde start_download_watcher o agotar el tiempo.
+    Devuelve la lista de nombres de archivos descargados.
+    """
+    archivos_detectados = set()
+    limite = time.monotonic() + timeout
+    while len(archivos_detectados) < num_descargas:
+        restante = limite - time.monotonic()
+        if restante <= 0:
+            logging.error(f"No se detectaron todas las descargas esperadas ({num_descargas}). Solo detectados: {len(archivos_detectados)}")
+            break
+        try:
+            archivo = cola.get(timeout=restante)
+        except queue.Empty:
+            continue
+        if archivo not in archivos_detectados:
+            logging.info(f"Archivo nuevo detectado: {archivo}")
+            archivos_detectados.add(archivo)
+    return list(archivos_detectados)
+
+def stop_download_watcher(observer):
+    """Detiene el observador de descargas iniciado con start_download_watcher."""
+    observer.stop()
+    observer.join()
+
 def save_snapshot(snapshot: dict, filename: str):
     """Guarda el snapshot en un JSON."""
     with open(filename, 'w', encoding='utf-8') as f:
@@ -116,8 +193,51 @@ def wait_for_new_download(download_path: str, old_state: dict, num_descargas: in
     logging.error(f"No se detectaron todas las descargas esperadas ({num_descargas}). Solo detectados: {len(archivos_detectados)}")
     return list(archivos_detectados)
 
+def wait_until_quiescent(download_path: str, timeout: float = 10, poll: float = 0.2) -> bool:
+    """
+    Espera hasta que la carpeta de descargas quede en reposo: sin archivos temporales
+    (.crdownload, .part) y sin cambios de fecha de modificación durante poll*2 segundos.
+    Devuelve True si la carpeta queda en reposo antes de agotar el tiempo, False en caso contrario.
+    """
+    if not os.path.isdir(download_path):
+        return True
+    limite = time.monotonic() + timeout
+    ultimo_mtime = None
+    estable_desde = time.monotonic()
+    while time.monotonic() < limite:
+        pendientes = False
+        mtime = 0
+        try:
+            with os.scandir(download_path) as it:
+                for entrada in it:
+                    if entrada.name.endswith(('.crdownload', '.part')):
+                        pendientes = True
+                    try:
+                        mtime = max(mtime, entrada.stat().st_mtime)
+                    except OSError:
+                        # El navegador ha renombrado o borrado el archivo durante el escaneo
+                        pendientes = True
+        except OSError as e:
+            logging.warning(f"No se pudo leer la carpeta {download_path}: {e}")
+            pendientes = True
+        if mtime != ultimo_mtime:
+            ultimo_mtime = mtime
+            estable_desde = time.monotonic()
+        if not pendientes and time.monotonic() - estable_desde >= poll * 2:
+            return True
+        time.sleep(poll)
+    logging.warning(f"La carpeta {download_path} no quedó en reposo en {timeout} segundos.")
+    return False
+
 # ------------------- FUNCIONES REUTILIZABLES PARA OTROS SCRIPTS -------------------
 
+def get_download_path(folder_name: str, product_name: str) -> str:
+    """
+    Devuelve la ruta absoluta de la carpeta de descargas BASE_DIR/descargas/[folder_name]/[product_name]
+    que usa setup_descarga, sin crearla.
+    """
+    return os.path.abspath(os.path.join(BASE_DIR, "descargas", folder_name, product_name))
+
 def setup_descarga(driver: webdriver.Chrome, folder_name: str, product_name: str) -> str:
     """
     Prepara el entorno de descargas para Selenium.
@@ -131,19 +251,8 @@ def setup_descarga(driver: webdriver.Chrome, folder_name: str, product_name: str
     Returns:
         str: Ruta absoluta de la carpeta de descargas.
     """
-    base_download_folder = os.path.join(BASE_DIR, "descargas")
-    
-    # Usar (o crear) la carpeta de la empresa
-    empresa_folder = os.path.join(base_download_folder, folder_name)
-    if not os.path.exists(empresa_folder):
-        os.makedirs(empresa_folder, exist_ok=True)
-    
-    # Usar (o crear) la carpeta del producto dentro de la empresa
-    producto_folder = os.path.join(empresa_folder, product_name)
-    if not os.path.exists(producto_folder):
-        os.makedirs(producto_folder, exist_ok=True)
-    
-    download_path = ensure_download_path(producto_folder)
+    # Usar (o crear) la carpeta del producto dentro de la carpeta de la empresa
+    download_path = ensure_download_path(get_download_path(folder_name, product_name))
     configure_driver_download_path(driver, download_path)
     logging.info(f"Descargas configuradas en: {download_path}")
     return download_path
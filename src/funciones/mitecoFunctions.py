@@ -0,0 +1,26 @@
+"""
+Módulo: mitecoFunctions.py
+
+Funciones auxiliares para la sede electrónica de MITECO que no dependen de Selenium:
+  - driver_en_expediente(driver, regage): comprueba si la URL actual del navegador
+    corresponde exactamente al expediente indicado.
+"""
+
+import urllib.parse
+
+def driver_en_expediente(driver, regage) -> bool:
+    """
+    Indica si el parámetro idExpediente de driver.current_url coincide exactamente con regage.
+    Sin regage siempre devuelve False.
+
+    Args:
+        driver: Instancia del navegador (o cualquier objeto con el atributo current_url).
+        regage: Identificador del expediente.
+
+    Returns:
+        bool: True si la URL actual es la del expediente, False en caso contrario.
+    """
+    if not regage:
+        return False
+    query = urllib.parse.urlparse(driver.current_url).query
+    return urllib.parse.parse_qs(query).get("idExpediente") == [str(regage)]
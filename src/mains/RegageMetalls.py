@@ -9,255 +9,409 @@ Flujo general:
   1. Lee todas las carpetas dentro de output.
   2. Para cada archivo .json dentro de cada carpeta, construye el enlace personalizado de MITECO.
   3. Abre el enlace en el navegador con Selenium, realiza la autenticación y descarga los archivos asociados en una carpeta única por iteración.
-  4. Repite el proceso para todos los registros.
+  4. Repite el proceso para todos los registros, repartiéndolos entre varios navegadores en paralelo
+     (número de workers configurable con la variable de entorno REGAGE_WORKERS, por defecto 1).
 
 Ejemplo de uso:
-    Ejecutar este script abrirá secuencialmente todos los enlaces de los .json en output en el navegador y descargará los archivos correspondientes.
+    Ejecutar este script abrirá todos los enlaces de los .json en output en el navegador y descargará los archivos correspondientes.
 """
 
 # Imports básicos de Python
 import os
+import errno
 import json
+import pathlib
 import shutil
 import logging
-import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List
 
+try:
+    import orjson
+except ImportError:  # orjson es opcional: se usa json de la librería estándar
+    orjson = None
+
 # Imports propios del proyecto
 import src.funciones.certHandler as certHandler
-from funciones import downloadFunctions, webFunctions
+from funciones import downloadFunctions, mitecoFunctions, webFunctions
 from utils import webConfiguration, loggerConfig
+from utils.reintentos import CircuitBreaker, retry
 from src.utils.config import BASE_DIR, cargar_variables
 from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.wait import WebDriverWait
+
+logger = logging.getLogger(__name__)
 
 # Variables de configuración
 INFO_CERTS = os.path.join(BASE_DIR, "data", "informacionCertsMetalls.txt")
 info = cargar_variables(INFO_CERTS)
 
+# Plantilla del enlace de detalle de expediente de MITECO
+# (regage, nif_productor, nif_representante, regage, nif_productor)
+_LINK_TEMPLATE = (
+    "https://sede.miteco.gob.es/portal/site/seMITECO/area_personal"
+    "?btnDetalleProc=btnDetalleProc"
+    "&pagina=1"
+    "&idExpediente=%s"
+    "&idProcedimiento=736"
+    "&idSubOrganoResp=11"
+    "&idDocIdentificativo=%s"
+    "&idDocRepresentante=%s"
+    "&idEstadoSeleccionado=-1"
+    "&idTipoProcSeleccionado=EN+REPRESENTACION+(REA)"
+    "&regInicial=%s"
+    "&nifTitular=%s"
+    "&numPagSolSelec=10#no-back-button"
+)
+
+# Tabla para convertir nombres de productor/residuo en nombres de carpeta válidos
+_SANITIZE = str.maketrans({' ': '_', '*': None, '/': '_', '\\': '_'})
+
+# El popup de selección de certificado es una ventana del sistema: solo un worker puede manejarlo a la vez,
+# y con varios workers cada uno lo busca en su propia ventana de Chrome (identificada por un título único)
+_CERT_LOCK = threading.Lock()
+
 def get_linkMiteco(regage_val, nif_productor, nif_representante):
     """
     Construye el enlace de detalle de expediente de MITECO para un registro dado.
     """
-    linkMiteco = (
-        "https://sede.miteco.gob.es/portal/site/seMITECO/area_personal"
-        "?btnDetalleProc=btnDetalleProc"
-        "&pagina=1"
-        f"&idExpediente={regage_val}"
-        "&idProcedimiento=736"
-        "&idSubOrganoResp=11"
-        f"&idDocIdentificativo={nif_productor}"
-        f"&idDocRepresentante={nif_representante}"
-        "&idEstadoSeleccionado=-1"
-        "&idTipoProcSeleccionado=EN+REPRESENTACION+(REA)"
-        f"&regInicial={regage_val}"
-        f"&nifTitular={nif_productor}"
-        "&numPagSolSelec=10#no-back-button"
-    )
-    logging.info("[INFO-01] Enlace MITECO generado: %s", linkMiteco)
+    linkMiteco = _LINK_TEMPLATE % (regage_val, nif_productor, nif_representante, regage_val, nif_productor)
+    logger.info("[INFO-01] Enlace MITECO generado: %s", linkMiteco)
     return linkMiteco
 
-def autenticar_y_seleccionar_certificado(driver):
+def autenticar_y_seleccionar_certificado(driver, timeout=30, titulo_ventana=None):
     """
-    Realiza el proceso de autenticación y selección de certificado en la web de MITECO,
-    con varios intentos en caso de fallo.
+    Realiza el proceso de autenticación y selección de certificado en la web de MITECO.
+    Los pasos en la web usan esperas explícitas; solo la selección del certificado
+    (popup del sistema) se reintenta varias veces.
+    Si se indica titulo_ventana (varios navegadores abiertos), antes de abrir el popup se da ese título
+    a la pestaña para localizar la ventana de este navegador; si no, se busca la ventana "Chrome".
     """
-    max_intentos = 100
-    for intento in range(1, max_intentos + 1):
-        try:
-            webFunctions.esperar_elemento_por_id(driver, "breadcrumb")
-            webFunctions.clickar_boton_por_value(driver, "acceder")
-            webFunctions.clickar_boton_por_texto(driver, "Acceso DNIe / Certificado electrónico")
-            certHandler.seleccionar_certificado_chrome(info.get("NOMBRE_CERT"))
-            logging.info(f"[INFO-02] Autenticación completada en el intento {intento}.")
-            break
-        except Exception as e:
-            logging.warning(f"[WARN-01] Intento {intento}/{max_intentos} fallido en autenticación: {e}")
-            time.sleep(0.5)
-    else:
-        logging.error(f"[ERR-01] No se pudo completar la autenticación tras {max_intentos} intentos.")
-        raise Exception("Fallo en la autenticación tras varios intentos")
+    nombre_ventana = titulo_ventana or "Chrome"
+
+    def _seleccionar_certificado():
+        if not certHandler.seleccionar_certificado_chrome(info.get("NOMBRE_CERT"), nombre_ventana=nombre_ventana):
+            raise Exception("No se pudo seleccionar el certificado")
+
+    try:
+        wait = WebDriverWait(driver, timeout)
+        wait.until(EC.presence_of_element_located((By.ID, "breadcrumb")))
+        wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[value='acceder']"))).click()
+        with _CERT_LOCK:
+            if titulo_ventana:
+                driver.execute_script("document.title = arguments[0];", titulo_ventana)
+            wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Acceso DNIe / Certificado electrónico')]"))).click()
+            retry(_seleccionar_certificado, max_attempts=3, descripcion="selección de certificado")
+        logger.info("[INFO-02] Autenticación completada.")
+    except Exception as e:
+        # El error se registra en quien llama (ERR-06 en iniciar_sesion)
+        raise Exception(f"Fallo en la autenticación: {e}") from e
 
-def descargar_documentos(driver, download_path, numDownloads=2):
+def descargar_documentos(driver, download_path, numDownloads=2, cerrar_al_terminar=True):
     """
     Lanza la descarga de los documentos asociados a un expediente MITECO.
     El driver ya debe estar en la página correcta después de la autenticación.
-    Cierra el navegador inmediatamente después de hacer clic en los PDFs.
+    Si cerrar_al_terminar es True, cierra el navegador al terminar de esperar las descargas.
     """
     archivos_descargados = []
-    old_state = downloadFunctions.snapshot_folder_state(download_path)
+    # Observar la carpeta por eventos antes de lanzar las descargas; sin watchdog se usa polling
+    watcher = downloadFunctions.start_download_watcher(download_path)
+    old_state = downloadFunctions.snapshot_folder_state(download_path) if watcher is None else None
     try:
         # Lanzar descargas
         webFunctions.clickar_todos_los_links(driver, ".pdf")
-        logging.info("[INFO-03] Clic en los PDFs realizado.")
+        logger.info("[INFO-03] Clic en los PDFs realizado.")
 
-        # Esperar la descarga (sin navegador)
-        logging.info(f"[INFO-04] Esperando {numDownloads} descargas en {download_path}...")
-        archivos_descargados = downloadFunctions.wait_for_new_download(download_path, old_state, numDownloads)
-        logging.info(f"[INFO-05] Archivos descargados: {archivos_descargados}")
+        # Esperar la descarga
+        logger.info("[INFO-04] Esperando %s descargas en %s...", numDownloads, download_path)
+        if watcher is not None:
+            archivos_descargados = downloadFunctions.wait_for_download_events(watcher[1], numDownloads)
+        else:
+            archivos_descargados = downloadFunctions.wait_for_new_download(download_path, old_state, numDownloads)
+        logger.info("[INFO-05] Archivos descargados: %s", archivos_descargados)
 
     except Exception as e:
-        logging.error(f"[ERR-02] Error durante la descarga de documentos: {e}")
+        logger.error("[ERR-02] Error durante la descarga de documentos: %s", e)
     finally:
-        try:
-            driver.quit()
-            logging.info("[INFO-06] Navegador cerrado después de intentar descargar los PDFs.")
-        except Exception as quit_error:
-            logging.error(f"[ERR-03] Error cerrando el navegador en finally: {quit_error}")
+        if watcher is not None:
+            downloadFunctions.stop_download_watcher(watcher[0])
+        if cerrar_al_terminar:
+            try:
+                driver.quit()
+                logger.info("[INFO-06] Navegador cerrado después de intentar descargar los PDFs.")
+            except Exception as quit_error:
+                logger.error("[ERR-03] Error cerrando el navegador en finally: %s", quit_error)
 
     return archivos_descargados
 
-def procesar_registro(registro):
+def leer_registro(ruta_json):
+    """
+    Lee un archivo .json de registro de una sola vez y lo decodifica (con orjson si está disponible).
+    """
+    contenido = pathlib.Path(ruta_json).read_bytes()
+    if orjson is not None:
+        return orjson.loads(contenido)
+    return json.loads(contenido)
+
+def nombres_carpeta(registro):
+    """
+    Devuelve (nombre_productor, nombre_residuo) del registro, saneados para usarlos como nombres de carpeta.
+    """
+    nombre_productor = registro.get("nombre_productor", "desconocido").translate(_SANITIZE)
+    nombre_residuo = registro.get("nombre_residuo", "desconocido").translate(_SANITIZE)
+    return nombre_productor, nombre_residuo
+
+def mover_a_trash(ruta_json, nombre_productor, trash_dirs):
     """
-    Procesa un único registro de regage.json: abre el enlace, autentica, descarga y guarda los archivos.
-    Cierra completamente el navegador después de hacer clic en los PDFs para evitar bloqueos.
+    Mueve el archivo .json ya procesado a BASE_DIR/trash/{nombre_productor}.
+    trash_dirs guarda las carpetas trash ya creadas durante el procesamiento actual, por nombre de productor.
+    """
+    try:
+        trash_dir = trash_dirs.get(nombre_productor)
+        if trash_dir is None:
+            trash_dir = os.path.join(BASE_DIR, "trash", nombre_productor)
+            os.makedirs(trash_dir, exist_ok=True)
+            trash_dirs[nombre_productor] = trash_dir
+        destino = os.path.join(trash_dir, os.path.basename(ruta_json))
+        try:
+            os.replace(ruta_json, destino)
+        except OSError as e:
+            # os.replace no puede mover entre unidades distintas
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(ruta_json, destino)
+        logger.info("[INFO-19] Archivo %s movido a %s.", os.path.basename(ruta_json), destino)
+    except Exception as e:
+        logger.error("[ERR-15] Error al mover %s a trash: %s", ruta_json, e)
+
+def cerrar_navegador(driver, user_data_dir=None):
+    """
+    Cierra el navegador y elimina su carpeta de perfil temporal, si la tiene.
+    """
+    try:
+        driver.quit()
+        logger.info("[INFO-16] Navegador cerrado.")
+    except Exception as quit_error:
+        logger.error("[ERR-11] Error cerrando el navegador: %s", quit_error)
+    if user_data_dir:
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+def iniciar_sesion(driver, linkMiteco, titulo_ventana=None):
+    """
+    Abre el enlace de MITECO y realiza la autenticación con certificado.
+    titulo_ventana se pasa a autenticar_y_seleccionar_certificado.
+    Devuelve True si la sesión queda iniciada, False en caso contrario.
+    """
+    # Intentar abrir la web con reintentos
+    try:
+        retry(lambda: webFunctions.abrir_web(driver, linkMiteco), max_attempts=3, descripcion="apertura de la web")
+        logger.info("[INFO-10] Web abierta correctamente.")
+    except Exception as e:
+        logger.error("[ERR-05] No se pudo abrir la web tras varios intentos: %s", e)
+        return False
+
+    # Autenticar y seleccionar certificado
+    try:
+        autenticar_y_seleccionar_certificado(driver, titulo_ventana=titulo_ventana)
+        logger.info("[INFO-11] Autenticación completada.")
+    except Exception as e:
+        logger.error("[ERR-06] No se pudo completar la autenticación: %s", e)
+        return False
+    return True
+
+def en_pagina_expediente(driver, regage, timeout=2):
+    """
+    Comprueba si el navegador ya está en la página del expediente indicado
+    (el parámetro idExpediente de la URL coincide exactamente y se muestran los enlaces a los PDFs).
+    Sin regage nunca se considera que ya está en la página.
+    """
+    try:
+        if not mitecoFunctions.driver_en_expediente(driver, regage):
+            return False
+    except WebDriverException:
+        return False
+    return bool(webFunctions.encontrar_elementos(driver, By.XPATH, "//a[contains(text(), '.pdf')]", timeout))
+
+def procesar_registro_reusing(driver, registro):
+    """
+    Procesa un registro con un navegador ya autenticado: abre el enlace del expediente,
+    redirige las descargas a la carpeta del producto y descarga los documentos sin cerrar el navegador.
     """
     regage = registro.get("regage", "")
     nif_productor = registro.get("nif_productor", "")
     nif_representante = registro.get("nif_representante", "")
-    nombre_productor = registro.get("nombre_productor", "desconocido").replace(" ", "_")
-    nombre_residuo = registro.get("nombre_residuo", "desconocido").replace(" ", "_").replace("*", "")
+    nombre_productor, nombre_residuo = nombres_carpeta(registro)
+
+    logger.info("[INFO-07] Iniciando procesamiento para regage=%s, productor=%s, representante=%s", regage, nif_productor, nif_representante)
 
-    driver = None
-    logging.info(f"[INFO-07] Iniciando procesamiento para regage={regage}, productor={nif_productor}, representante={nif_representante}")
-    
     try:
         # Construir la URL
         linkMiteco = get_linkMiteco(regage, nif_productor, nif_representante)
-        logging.info(f"[INFO-08] Procesando registro: {nombre_residuo} ({nombre_productor})")
-        logging.info(f"[INFO-09] Enlace a abrir: {linkMiteco}")
+        logger.info("[INFO-08] Procesando registro: %s (%s)", nombre_residuo, nombre_productor)
+        logger.info("[INFO-09] Enlace a abrir: %s", linkMiteco)
 
-        # Configurar el navegador
-        driver = webConfiguration.configure()
-        if not driver:
-            logging.error("[ERR-04] No se pudo iniciar el navegador.")
-            return None
-
-        # Intentar abrir la web con reintentos
-        max_intentos = 5000
-        for intento in range(1, max_intentos + 1):
-            try:
-                webFunctions.abrir_web(driver, linkMiteco)
-                logging.info(f"[INFO-10] Web abierta correctamente en el intento {intento}.")
-                break
-            except Exception as e:
-                logging.warning(f"[WARN-02] Intento {intento}/{max_intentos} fallido al abrir la web: {e}")
-                time.sleep(0.5)
-        else:
-            logging.error(f"[ERR-05] No se pudo abrir la web tras {max_intentos} intentos.")
-            return None
-
-        # Autenticar y seleccionar certificado con reintentos
-        max_intentos_auth = 5000
-        for intento in range(1, max_intentos_auth + 1):
-            try:
-                autenticar_y_seleccionar_certificado(driver)
-                logging.info(f"[INFO-11] Autenticación completada en el intento {intento}.")
-                break
-            except Exception as e:
-                logging.warning(f"[WARN-03] Intento de autenticación {intento}/{max_intentos_auth} fallido: {e}")
-                time.sleep(0.5)
+        # Abrir el enlace con la sesión ya iniciada, salvo que la autenticación ya haya redirigido al expediente
+        if en_pagina_expediente(driver, regage):
+            logger.info("[INFO-24] El navegador ya está en el expediente %s; no se reabre la web.", regage)
         else:
-            logging.error(f"[ERR-06] No se pudo completar la autenticación tras {max_intentos_auth} intentos.")
-            return None
-
-        # Volver a abrir el enlace después de la autenticación con reintentos
-        for intento in range(1, max_intentos + 1):
             try:
-                webFunctions.abrir_web(driver, linkMiteco)
-                logging.info(f"[INFO-12] Web reabierta después de autenticación en el intento {intento}.")
-                break
+                retry(lambda: webFunctions.abrir_web(driver, linkMiteco), max_attempts=3, descripcion="reapertura de la web")
+                logger.info("[INFO-12] Web reabierta después de autenticación.")
             except Exception as e:
-                logging.warning(f"[WARN-04] Intento {intento}/{max_intentos} fallido al reabrir la web: {e}")
-                time.sleep(0.5)
-        else:
-            logging.error(f"[ERR-07] No se pudo reabrir la web tras {max_intentos} intentos.")
-            return None
+                logger.error("[ERR-07] No se pudo reabrir la web tras varios intentos: %s", e)
+                return None
 
-        # Configurar carpeta de descargas única para este producto
+        # Configurar carpeta de descargas única para este producto (Page.setDownloadBehavior)
         download_path = downloadFunctions.setup_descarga(driver, nombre_productor, nombre_residuo)
-        logging.info(f"[INFO-13] Carpeta de descarga configurada: {download_path}")
-
-        # Descargar documentos (se cerrará el navegador dentro de esta función)
-        archivos_descargados = descargar_documentos(driver, download_path)
-        driver = None  # El driver ya fue cerrado en descargar_documentos
-        
-        logging.info(f"[INFO-14] Descarga finalizada para {nombre_residuo} ({nombre_productor}).")
-        logging.info(f"[INFO-15] Archivos descargados: {archivos_descargados}")
-        
+        logger.info("[INFO-13] Carpeta de descarga configurada: %s", download_path)
+
+        archivos_descargados = descargar_documentos(driver, download_path, cerrar_al_terminar=False)
+
+        logger.info("[INFO-14] Descarga finalizada para %s (%s).", nombre_residuo, nombre_productor)
+        logger.info("[INFO-15] Archivos descargados: %s", archivos_descargados)
+
         return archivos_descargados
 
     except TimeoutException as e:
-        logging.error(f"[ERR-08] Timeout al procesar registro: regage={regage}, productor={nif_productor}, representante={nif_representante}. Error: {e}")
+        logger.error("[ERR-08] Timeout al procesar registro: regage=%s, productor=%s, representante=%s. Error: %s", regage, nif_productor, nif_representante, e)
         return None
     except WebDriverException as e:
-        logging.error(f"[ERR-09] Error del navegador al procesar registro: regage={regage}, productor={nif_productor}, representante={nif_representante}. Error: {e}")
+        logger.error("[ERR-09] Error del navegador al procesar registro: regage=%s, productor=%s, representante=%s. Error: %s", regage, nif_productor, nif_representante, e)
         return None
     except Exception as e:
-        logging.error(f"[ERR-10] Error procesando registro: regage={regage}, productor={nif_productor}, representante={nif_representante}. Error: {e}")
+        logger.error("[ERR-10] Error procesando registro: regage=%s, productor=%s, representante=%s. Error: %s", regage, nif_productor, nif_representante, e)
         return None
-    finally:
-        # Cerrar completamente el navegador si aún está abierto
-        if driver:
-            try:
-                driver.quit()
-                logging.info(f"[INFO-16] Navegador cerrado en finally para {nombre_residuo} ({nombre_productor}).")
-            except Exception as quit_error:
-                logging.error(f"[ERR-11] Error cerrando el navegador en finally: {quit_error}")
+
+def leer_num_workers():
+    """
+    Lee el número de workers de la variable de entorno REGAGE_WORKERS (por defecto 1, mínimo 1).
+    """
+    valor = os.getenv("REGAGE_WORKERS", "1")
+    try:
+        return max(1, int(valor))
+    except ValueError:
+        logger.warning("[WARN-07] Valor no válido para REGAGE_WORKERS (%r); se usa 1 worker.", valor)
+        return 1
 
 def procesar_multiple_regages(max_registros=100):
     """
     Procesa un número limitado de registros de /output/{nombre_productor}/regage_{nombre_residuo}.json.
-    Cada registro abre un nuevo navegador, procesa y lo cierra inmediatamente.
+    Los registros se reparten entre REGAGE_WORKERS hilos; cada hilo abre un único navegador
+    (con un perfil de Chrome independiente), se autentica una vez y lo reutiliza para todos sus registros.
+    Si un registro falla con un navegador reutilizado, el navegador se descarta y el registro se reintenta
+    una vez con una sesión nueva antes de moverlo a trash.
     """
     output_base = os.path.join(BASE_DIR, "output")
     if not os.path.exists(output_base):
-        logging.error(f"[ERR-12] No se encontró la carpeta: {output_base}")
+        logger.error("[ERR-12] No se encontró la carpeta: %s", output_base)
         return
 
-    carpetas = [os.path.join(output_base, d) for d in os.listdir(output_base) if os.path.isdir(os.path.join(output_base, d))]
-    if not carpetas:
-        logging.error(f"[ERR-13] No se encontraron carpetas de productor en: {output_base}")
+    # Leer los registros a procesar (/output/{nombre_productor}/*.json)
+    registros = []
+    for ruta_json in pathlib.Path(output_base).glob("*/*.json"):
+        if len(registros) >= max_registros:
+            # Quedan archivos .json sin leer
+            logger.info("[INFO-17] Se alcanzó el límite de registros procesados: %s", max_registros)
+            break
+        try:
+            registros.append((str(ruta_json), leer_registro(ruta_json)))
+        except Exception as e:
+            logger.error("[ERR-14] Error leyendo %s: %s", ruta_json, e)
+    if not registros:
+        logger.error("[ERR-13] No se encontraron registros .json en las carpetas de productor de: %s", output_base)
         return
 
-    registros_procesados = 0
-    for carpeta in carpetas:
-        archivos_json = [f for f in os.listdir(carpeta) if f.lower().endswith('.json')]
-        for archivo_json in archivos_json:
-            if registros_procesados >= max_registros:
-                logging.info(f"[INFO-17] Se alcanzó el límite de registros procesados: {max_registros}")
-                return
-
-            ruta_json = os.path.join(carpeta, archivo_json)
-            logging.info(f"[INFO-18] Procesando archivo {registros_procesados + 1}/{max_registros}: {archivo_json}")
-            
-            with open(ruta_json, "r", encoding="utf-8") as f:
-                try:
-                    registro = json.load(f)
-                except Exception as e:
-                    logging.error(f"[ERR-14] Error leyendo {ruta_json}: {e}")
-                    continue
-
-            # Procesar el registro (abre navegador, procesa y lo cierra)
-            archivos_descargados = procesar_registro(registro)
-            registros_procesados += 1
-
-            # Mover el archivo procesado a la carpeta trash
-            # Extrae el nombre del productor del registro
-            nombre_productor = registro.get("nombre_productor", "desconocido").replace(" ", "_")
-            trash_dir = os.path.join(BASE_DIR, "trash", nombre_productor)
-            os.makedirs(trash_dir, exist_ok=True)
-            destino = os.path.join(trash_dir, os.path.basename(ruta_json))
-            try:
-                shutil.move(ruta_json, destino)
-                logging.info(f"[INFO-19] Archivo {os.path.basename(ruta_json)} movido a {destino}.")
-            except Exception as e:
-                logging.error(f"[ERR-15] Error al mover {ruta_json} a trash: {e}")
+    max_workers = leer_num_workers()
+    breaker = CircuitBreaker()
+    # Carpetas trash ya creadas en este procesamiento, por nombre de productor
+    trash_dirs = {}
+    estado_hilo = threading.local()
+    navegadores = []
+    navegadores_lock = threading.Lock()
+
+    def _descartar_navegador():
+        driver, user_data_dir = estado_hilo.navegador
+        estado_hilo.navegador = None
+        with navegadores_lock:
+            navegadores.remove((driver, user_data_dir))
+        cerrar_navegador(driver, user_data_dir)
+
+    def _obtener_navegador(registro):
+        # Cada hilo crea y autentica su navegador una sola vez
+        if getattr(estado_hilo, "navegador", None):
+            return estado_hilo.navegador[0]
+        user_data_dir = tempfile.mkdtemp(prefix="regage_chrome_")
+        driver = webConfiguration.configure(user_data_dir=user_data_dir)
+        if not driver:
+            logger.error("[ERR-04] No se pudo iniciar el navegador.")
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            return None
+        estado_hilo.navegador = (driver, user_data_dir)
+        with navegadores_lock:
+            navegadores.append((driver, user_data_dir))
+        linkMiteco = get_linkMiteco(registro.get("regage", ""), registro.get("nif_productor", ""), registro.get("nif_representante", ""))
+        # Solo con varios navegadores abiertos hace falta identificar la ventana por un título único
+        titulo_ventana = f"REGAGE-{threading.get_ident()}" if max_workers > 1 else None
+        if not iniciar_sesion(driver, linkMiteco, titulo_ventana):
+            _descartar_navegador()
+            return None
+        return driver
+
+    def _intentar_registro(registro):
+        # Devuelve (archivos_descargados, si se usó un navegador ya autenticado por un registro anterior)
+        reutilizado = bool(getattr(estado_hilo, "navegador", None))
+        driver = _obtener_navegador(registro)
+        if not driver:
+            return None, False
+        archivos_descargados = procesar_registro_reusing(driver, registro)
+        if not archivos_descargados:
+            # Esperar a que la carpeta de este registro quede en reposo antes de cerrar el navegador
+            download_path = downloadFunctions.get_download_path(*nombres_carpeta(registro))
+            logger.info("[INFO-20] Esperando a que finalicen las descargas en %s...", download_path)
+            downloadFunctions.wait_until_quiescent(download_path)
+            # La sesión puede haber caducado: se descarta el navegador para volver a autenticarse
+            _descartar_navegador()
+        return archivos_descargados, reutilizado
+
+    def _procesar(ruta_json, registro):
+        if not breaker.allow():
+            logger.warning("[WARN-06] MITECO no disponible (cortocircuito abierto). Se omite %s.", os.path.basename(ruta_json))
+            return None
+        archivos_descargados = None
+        try:
+            archivos_descargados, reutilizado = _intentar_registro(registro)
+            if not archivos_descargados and reutilizado:
+                logger.info("[INFO-25] Reintentando %s con una sesión nueva.", os.path.basename(ruta_json))
+                archivos_descargados, _ = _intentar_registro(registro)
+            mover_a_trash(ruta_json, nombres_carpeta(registro)[0], trash_dirs)
+        except Exception as e:
+            # Cualquier error cuenta como fallo para que el cortocircuito no se quede en half_open
+            logger.error("[ERR-16] Error inesperado procesando %s: %s", os.path.basename(ruta_json), e)
+        if archivos_descargados:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        return archivos_descargados
 
-            # Pausa entre registros para evitar bloqueos
-            logging.info(f"[INFO-20] Esperando 10 segundos antes del siguiente registro...")
-            time.sleep(10)
+    registros_procesados = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futuros = {executor.submit(_procesar, ruta_json, registro): ruta_json for ruta_json, registro in registros}
+            for futuro in as_completed(futuros):
+                ruta_json = futuros[futuro]
+                futuro.result()
+                registros_procesados += 1
+                logger.info("[INFO-18] Archivo procesado %s/%s: %s", registros_procesados, len(registros), os.path.basename(ruta_json))
+    finally:
+        # Cerrar los navegadores que sigan abiertos
+        for driver, user_data_dir in list(navegadores):
+            cerrar_navegador(driver, user_data_dir)
 
-    logging.info(f"[INFO-21] Procesamiento completado. Total de registros procesados: {registros_procesados}")
+    logger.info("[INFO-21] Procesamiento completado. Total de registros procesados: %s", registros_procesados)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+SELENIUM_DISPONIBLE = importlib.util.find_spec("selenium") is not None
+
+if SELENIUM_DISPONIBLE:
+    from funciones import downloadFunctions
+
+
+class _EntradaDesaparecida:
+    """Entrada de os.scandir cuyo archivo se renombra antes de poder hacer stat."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def stat(self):
+        raise FileNotFoundError(self.name)
+
+
+class _ScandirFalso:
+    def __init__(self, entradas):
+        self.entradas = entradas
+
+    def __enter__(self):
+        return iter(self.entradas)
+
+    def __exit__(self, *args):
+        return False
+
+
+@unittest.skipUnless(SELENIUM_DISPONIBLE, "downloadFunctions requiere selenium")
+class TestWaitUntilQuiescent(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.carpeta = self.tmp.name
+
+    def test_carpeta_inexistente(self):
+        self.assertTrue(downloadFunctions.wait_until_quiescent(os.path.join(self.carpeta, "no_existe")))
+
+    def test_carpeta_en_reposo(self):
+        with open(os.path.join(self.carpeta, "documento.pdf"), "wb") as f:
+            f.write(b"%PDF")
+        self.assertTrue(downloadFunctions.wait_until_quiescent(self.carpeta, timeout=2, poll=0.05))
+
+    def test_descarga_pendiente_agota_el_tiempo(self):
+        open(os.path.join(self.carpeta, "documento.pdf.crdownload"), "wb").close()
+        self.assertFalse(downloadFunctions.wait_until_quiescent(self.carpeta, timeout=0.3, poll=0.05))
+
+    def test_archivo_renombrado_durante_el_escaneo(self):
+        with open(os.path.join(self.carpeta, "documento.pdf"), "wb") as f:
+            f.write(b"%PDF")
+        scandir_real = os.scandir
+        llamadas = []
+
+        def scandir(path):
+            llamadas.append(path)
+            if len(llamadas) == 1:
+                # Primer escaneo: Chrome renombra el .crdownload entre el listado y el stat
+                return _ScandirFalso([_EntradaDesaparecida("documento.pdf.crdownload")])
+            return scandir_real(path)
+
+        with mock.patch.object(downloadFunctions.os, "scandir", side_effect=scandir):
+            self.assertTrue(downloadFunctions.wait_until_quiescent(self.carpeta, timeout=2, poll=0.05))
+        self.assertGreater(len(llamadas), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
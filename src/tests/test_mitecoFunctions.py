@@ -0,0 +1,47 @@
+import unittest
+
+from funciones.mitecoFunctions import driver_en_expediente
+
+URL_EXPEDIENTE = (
+    "https://sede.miteco.gob.es/portal/site/seMITECO/area_personal"
+    "?btnDetalleProc=btnDetalleProc&pagina=1&idExpediente=%s&idProcedimiento=736"
+    "&regInicial=%s&numPagSolSelec=10#no-back-button"
+)
+
+
+class DriverFalso:
+    def __init__(self, current_url):
+        self.current_url = current_url
+
+
+class TestDriverEnExpediente(unittest.TestCase):
+
+    def test_coincidencia_exacta(self):
+        driver = DriverFalso(URL_EXPEDIENTE % ("NT123", "NT123"))
+        self.assertTrue(driver_en_expediente(driver, "NT123"))
+
+    def test_regage_numerico(self):
+        driver = DriverFalso(URL_EXPEDIENTE % ("123", "123"))
+        self.assertTrue(driver_en_expediente(driver, 123))
+
+    def test_prefijo_no_coincide(self):
+        # El navegador sigue en el expediente anterior NT1234
+        driver = DriverFalso(URL_EXPEDIENTE % ("NT1234", "NT1234"))
+        self.assertFalse(driver_en_expediente(driver, "NT123"))
+
+    def test_subcadena_no_coincide(self):
+        driver = DriverFalso(URL_EXPEDIENTE % ("NT123", "NT123"))
+        self.assertFalse(driver_en_expediente(driver, "T12"))
+
+    def test_regage_vacio_no_coincide(self):
+        driver = DriverFalso(URL_EXPEDIENTE % ("NT123", "NT123"))
+        self.assertFalse(driver_en_expediente(driver, ""))
+        self.assertFalse(driver_en_expediente(DriverFalso(URL_EXPEDIENTE % ("", "")), ""))
+
+    def test_url_sin_expediente(self):
+        driver = DriverFalso("https://sede.miteco.gob.es/portal/site/seMITECO/login")
+        self.assertFalse(driver_en_expediente(driver, "NT123"))
+
+
+if __name__ == "__main__":
+    unittest.main()
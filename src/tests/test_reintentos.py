@@ -0,0 +1,99 @@
+import unittest
+from unittest import mock
+
+from utils.reintentos import CircuitBreaker, retry
+
+
+class TestRetry(unittest.TestCase):
+
+    @mock.patch("utils.reintentos.time.sleep")
+    def test_devuelve_resultado_tras_fallos_transitorios(self, sleep):
+        llamadas = []
+
+        def fn():
+            llamadas.append(1)
+            if len(llamadas) < 3:
+                raise ValueError("fallo transitorio")
+            return "ok"
+
+        self.assertEqual(retry(fn, max_attempts=5), "ok")
+        self.assertEqual(len(llamadas), 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    @mock.patch("utils.reintentos.time.sleep")
+    def test_relanza_tras_max_attempts(self, sleep):
+        fn = mock.Mock(side_effect=ValueError("fallo persistente"))
+        with self.assertRaises(ValueError):
+            retry(fn, max_attempts=4)
+        self.assertEqual(fn.call_count, 4)
+        # No se espera después del último intento
+        self.assertEqual(sleep.call_count, 3)
+
+    @mock.patch("utils.reintentos.time.sleep")
+    def test_espera_exponencial_acotada(self, sleep):
+        fn = mock.Mock(side_effect=ValueError("fallo"))
+        with self.assertRaises(ValueError):
+            retry(fn, max_attempts=8, base=1.0, cap=4.0)
+        esperas = [c.args[0] for c in sleep.call_args_list]
+        for intento, espera in enumerate(esperas):
+            delay = min(4.0, 1.0 * 2 ** intento)
+            self.assertGreaterEqual(espera, delay * 0.5)
+            self.assertLessEqual(espera, delay * 1.5)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_se_abre_tras_fail_threshold_fallos(self):
+        breaker = CircuitBreaker(fail_threshold=3, reset_timeout=60)
+        for _ in range(2):
+            self.assertTrue(breaker.allow())
+            breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+    def test_exito_reinicia_el_contador(self):
+        breaker = CircuitBreaker(fail_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+
+    @mock.patch("utils.reintentos.time.monotonic")
+    def test_half_open_deja_pasar_una_prueba_y_cierra(self, monotonic):
+        monotonic.return_value = 1000.0
+        breaker = CircuitBreaker(fail_threshold=1, reset_timeout=120)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+
+        monotonic.return_value = 1119.0
+        self.assertFalse(breaker.allow())
+
+        monotonic.return_value = 1120.0
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, "half_open")
+        # Solo un registro de prueba a la vez
+        self.assertFalse(breaker.allow())
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow())
+
+    @mock.patch("utils.reintentos.time.monotonic")
+    def test_fallo_en_half_open_vuelve_a_abrir(self, monotonic):
+        monotonic.return_value = 0.0
+        breaker = CircuitBreaker(fail_threshold=5, reset_timeout=10)
+        for _ in range(5):
+            breaker.record_failure()
+
+        monotonic.return_value = 10.0
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertEqual(breaker.opened_at, 10.0)
+        self.assertFalse(breaker.allow())
+
+
+if __name__ == "__main__":
+    unittest.main()
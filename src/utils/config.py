@@ -1,4 +1,6 @@
+import functools
 import os
+import pathlib
 import sys
 
 if getattr(sys, 'frozen', False):
@@ -8,17 +10,20 @@ else:
     # Ejecución como script (.py)
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-def cargar_variables(filepath):
+@functools.lru_cache(maxsize=32)
+def _cargar_variables_cache(filepath, mtime):
     strings = {}
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#'):
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    strings[key.strip()] = value.strip()
+    for line in pathlib.Path(filepath).read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if line and line[0] != '#' and '=' in line:
+            key, value = line.split('=', 1)
+            strings[key.strip()] = value.strip()
     return strings
 
+def cargar_variables(filepath):
+    # Se cachea por (ruta, fecha de modificación): si el archivo cambia se vuelve a leer
+    return dict(_cargar_variables_cache(filepath, os.path.getmtime(filepath)))
+
 # Configuración de fechas
 AÑOS_VIGENCIA_CONTRATO = 5
 AÑOS_VIGENCIA_CONTRATO_CORTO = 3
@@ -0,0 +1,76 @@
+"""
+Módulo: reintentos.py
+
+Utilidades para tolerar fallos transitorios en las automatizaciones web:
+  - retry(fn, ...): ejecuta una función con reintentos acotados y espera exponencial con jitter.
+  - CircuitBreaker: cortocircuito que deja de intentar un servicio tras varios fallos consecutivos
+    y vuelve a probarlo pasado un tiempo.
+"""
+
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def retry(fn, *, max_attempts=10, base=0.25, cap=10.0, descripcion="operación"):
+    """
+    Ejecuta fn() con reintentos acotados y espera exponencial con jitter.
+    Devuelve el resultado de fn() o relanza la última excepción tras max_attempts intentos.
+    """
+    for intento in range(max_attempts):
+        try:
+            return fn()
+        except Exception as e:
+            if intento == max_attempts - 1:
+                raise
+            delay = min(cap, base * 2 ** intento)
+            logger.debug("Intento %d/%d fallido en %s: %s", intento + 1, max_attempts, descripcion, e)
+            time.sleep(delay * random.uniform(0.5, 1.5))
+
+class CircuitBreaker:
+    """
+    Cortocircuito para el acceso a un servicio externo (por ejemplo, MITECO).
+    Tras fail_threshold fallos consecutivos pasa a "open" y rechaza registros durante reset_timeout segundos;
+    después pasa a "half_open" y deja pasar un único registro de prueba, que lo cierra si tiene éxito.
+    """
+
+    def __init__(self, fail_threshold=5, reset_timeout=120):
+        self.fail_threshold = fail_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failure_count = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Indica si se puede intentar procesar un nuevo registro."""
+        with self._lock:
+            if self.state == "half_open":
+                # Ya hay un registro de prueba en curso
+                return False
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                logger.info("[INFO-22] Cortocircuito en estado half_open: probando un registro.")
+            return True
+
+    def record_success(self):
+        """Registra un éxito y cierra el cortocircuito."""
+        with self._lock:
+            if self.state != "closed":
+                logger.info("[INFO-23] Cortocircuito cerrado tras un registro correcto.")
+            self.state = "closed"
+            self.failure_count = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        """Registra un fallo y abre el cortocircuito si se supera el umbral o falla la prueba."""
+        with self._lock:
+            self.failure_count += 1
+            if self.state == "half_open" or self.failure_count >= self.fail_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                logger.warning("[WARN-05] Cortocircuito abierto tras %s fallos consecutivos.", self.failure_count)
@@ -5,11 +5,14 @@ from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
 
-def configure():
+def configure(user_data_dir=None):
     # Configurar el WebDriver para Google Chrome
     options = webdriver.ChromeOptions()
 
     # options.add_argument(r'--user-data-dir=C:\Users\Metalls1\AppData\Local\Google\Chrome\User Data')
+    if user_data_dir:
+        # Perfil propio para poder lanzar varios navegadores en paralelo sin conflictos
+        options.add_argument(f"--user-data-dir={user_data_dir}")
     options.add_argument('--profile-directory=Profile 2')
     options.add_argument("--no-first-run --no-default-browser-check")
     options.add_argument("--disable-features=ChromeWhatsNewUI")